@@ -1,36 +1,155 @@
 # quantum_expert_system.py
+import re
 import time
 import sqlite3
 import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
-from datetime import datetime
+import queue
+import threading
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.action_chains import ActionChains
-import json
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+import collections
+
+# Color for each result number 0-9
+NUMBER_COLORS = ('green', 'red', 'violet', 'red', 'violet', 'red', 'violet', 'red', 'violet', 'red')
+
+Prediction = collections.namedtuple('Prediction', ['prediction', 'confidence', 'strategy', 'reasoning'])
+
+PREDICTION_EMOJI = {'Big': '🔴', 'Small': '🔵'}
+
+PREDICTION_MESSAGE_TEMPLATE = (
+    "{emoji} <b>QUANTUM PREDICTION</b> {emoji}\n"
+    "\n"
+    "🎯 <b>Prediction:</b> <code>{prediction}</code>\n"
+    "📊 <b>Confidence:</b> <code>{confidence:.2%}</code> {confidence_color}\n"
+    "🎮 <b>Period:</b> <code>{period}</code>\n"
+    "🤖 <b>Strategy:</b> <code>{strategy}</code>\n"
+    "\n"
+    "💡 <b>Analysis:</b>\n"
+    "{reasoning}\n"
+    "\n"
+    "⏰ <i>Generated: {generated_at}</i>"
+)
 
 class QuantumExpertSystem:
+    RESULT_COLUMNS = ('period', 'number', 'big_small', 'color', 'game_type')
+    INSERT_RESULT_SQL = (
+        f"INSERT OR IGNORE INTO quantum_game_results ({', '.join(RESULT_COLUMNS)}) VALUES "
+    )
+    INSERT_PREDICTION_SQL = (
+        "INSERT OR IGNORE INTO quantum_predictions "
+        "(period, prediction, confidence, strategy_used) VALUES (?, ?, ?, ?)"
+    )
+    TRAINING_WINDOW = 50
+    # Stay below SQLite's default 999 bound-parameter limit
+    MAX_SQL_PARAMS = 900
+    PUZZLE_SELECTORS = (
+        ".verify-bar",
+        ".slider",
+        ".drag-handle",
+        "[class*='verify']",
+        "[class*='slider']",
+    )
+    USERNAME_SELECTORS = (
+        "input[type='text']",
+        "input[name='username']",
+        "input[placeholder*='phone']",
+        "input[placeholder*='email']",
+    )
+    PASSWORD_SELECTORS = (
+        "input[type='password']",
+        "input[name='password']",
+    )
+    GAME_INDICATORS = ('Period', 'Number', 'Big', 'Small', 'WinGo')
+    # Single XPath union: one driver round-trip per lookup. Class names are matched
+    # as whole tokens (like CSS .name), not substrings
+    CONFIRM_LOCATOR = (By.XPATH, (
+        "//button[normalize-space()='Confirm' or normalize-space()='OK'"
+        " or normalize-space()='Yes' or normalize-space()='Agree' or normalize-space()='Receive']"
+        " | //*[contains(concat(' ', normalize-space(@class), ' '), ' confirm-btn ')"
+        " or contains(concat(' ', normalize-space(@class), ' '), ' ok-button ')"
+        " or contains(concat(' ', normalize-space(@class), ' '), ' btn-confirm ')]"
+    ))
+    # Tried in order: the submit button wins over "Phone Login"-style tab buttons
+    LOGIN_LOCATORS = (
+        (By.XPATH, "//button[@type='submit']"),
+        (By.XPATH, "//button[normalize-space()='Login']"),
+        (By.XPATH, "//button[normalize-space()='Sign In']"),
+    )
+    # text() only matches an element's own text, so the tab item is found, not the tab bar
+    TAB_1M_LOCATOR = (By.XPATH, (
+        "//button[contains(., '1M')] | //a[contains(@href, '1M')]"
+        " | //*[contains(concat(' ', normalize-space(@class), ' '), ' tab ')]"
+        "/descendant-or-self::*[contains(text(), '1M')]"
+        " | //*[contains(@class, '1m')]"
+    ))
+    RESULTS_CONTAINER_SELECTOR = ".GameRecord__C-body, .result-list"
+    # Result rows render as three lines: 17-digit period (may be split by
+    # spaces or hyphens), number, Big/Small
+    GAME_ROW_RE = re.compile(
+        r'^[ \t-]*((?:\d[ -]*){17})[ \t]*\n\s*(\d)[ \t]*\n\s*(Big|Small)[ \t]*$', re.M
+    )
+
     def __init__(self, game_type="1M"):
         self.game_type = game_type
         self.telegram_bot_token = os.getenv('TELEGRAM_BOT_TOKEN')
         self.telegram_channel_id = os.getenv('TELEGRAM_CHANNEL_ID')
         self.club55_username = os.getenv('CLUB55_USERNAME')
         self.club55_password = os.getenv('CLUB55_PASSWORD')
+        self.remote_browser_url = os.getenv('SELENIUM_REMOTE_URL')
         
+        self.setup_http_session()
+        self.setup_telegram_worker()
         self.setup_quantum_database()
         self.setup_browser()
         self.current_running_period = None
+        self._results_container = None
+        # Ring buffer of recent results (True = Big) plus their periods for dedup
+        self._recent_big = np.zeros(self.TRAINING_WINDOW, dtype=np.bool_)
+        self._recent_pos = 0
+        self._recent_periods = None
+        self._last_prediction_key = None
+        self._last_prediction = None
+
+    def setup_http_session(self):
+        """Setup pooled keep-alive HTTP session for Telegram"""
+        self._telegram_url = f"https://api.telegram.org/bot{self.telegram_bot_token}/sendMessage"
+        self._http = requests.Session()
+        # sendMessage is not idempotent: only retry when Telegram cannot have
+        # accepted the message (connection failures, 429), never on read errors/5xx
+        retries = Retry(total=3, read=0, backoff_factor=0.2, allowed_methods=frozenset({"POST"}),
+                        status_forcelist=[429])
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retries)
+        self._http.mount("https://", adapter)
 
     def setup_quantum_database(self):
         """Initialize quantum database"""
         try:
-            self.conn = sqlite3.connect('quantum_data.db', check_same_thread=False)
+            self.conn = sqlite3.connect('quantum_data.db', check_same_thread=False,
+                                        cached_statements=256)
             self.cursor = self.conn.cursor()
-            
+            # Serializes writes from the cycle processor thread
+            self._db_lock = threading.Lock()
+
+            # WAL + relaxed sync: one fsync per checkpoint instead of two per commit
+            journal_mode = self.cursor.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+            if journal_mode.lower() != 'wal':
+                print(f"⚠️ WAL mode unavailable, using {journal_mode}")
+            self.cursor.executescript('''
+                PRAGMA synchronous=NORMAL;
+                PRAGMA temp_store=MEMORY;
+                PRAGMA cache_size=-20000;
+                PRAGMA mmap_size=268435456;
+            ''')
+
             self.cursor.execute('''
                 CREATE TABLE IF NOT EXISTS quantum_game_results (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -42,7 +161,12 @@ class QuantumExpertSystem:
                     game_type TEXT
                 )
             ''')
-            
+
+            self.cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_qgr_type_time
+                ON quantum_game_results (game_type, scraped_at DESC)
+            ''')
+
             self.cursor.execute('''
                 CREATE TABLE IF NOT EXISTS quantum_predictions (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -74,7 +198,19 @@ class QuantumExpertSystem:
             chrome_options.add_argument("--window-size=1920,1080")
             chrome_options.add_argument("--ignore-certificate-errors")
             
-            self.driver = webdriver.Chrome(options=chrome_options)
+            # Skip images and don't wait for subresources after DOMContentLoaded
+            chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+            chrome_options.add_experimental_option(
+                "prefs", {"profile.managed_default_content_settings.images": 2}
+            )
+            chrome_options.page_load_strategy = 'eager'
+            
+            if self.remote_browser_url:
+                # Attach to an already-running browser (e.g. a Selenium Grid pool)
+                self.driver = webdriver.Remote(command_executor=self.remote_browser_url,
+                                               options=chrome_options)
+            else:
+                self.driver = webdriver.Chrome(options=chrome_options)
             self.wait = WebDriverWait(self.driver, 15)
             print("✅ Browser setup complete")
             
@@ -82,41 +218,72 @@ class QuantumExpertSystem:
             print(f"❌ Browser setup failed: {e}")
             raise
 
+    def _bulk_insert(self, rows):
+        """Insert game result rows using multi-row VALUES statements"""
+        cols = len(self.RESULT_COLUMNS)
+        row_placeholder = f"({', '.join('?' * cols)})"
+        step = self.MAX_SQL_PARAMS // cols
+        
+        for i in range(0, len(rows), step):
+            chunk = rows[i:i + step]
+            placeholders = ", ".join([row_placeholder] * len(chunk))
+            self.cursor.execute(self.INSERT_RESULT_SQL + placeholders,
+                                [value for row in chunk for value in row])
+
+    def setup_telegram_worker(self):
+        """Start background worker that delivers queued Telegram messages"""
+        self._tg_queue = queue.Queue()
+        self._tg_thread = threading.Thread(target=self._telegram_worker, daemon=True)
+        self._tg_thread.start()
+
+    def _telegram_worker(self):
+        while True:
+            message = self._tg_queue.get()
+            if message is None:
+                break
+            self._post_telegram_message(message)
+
     def send_telegram_message(self, message):
+        """Queue message for Telegram without blocking the caller"""
+        if not self.telegram_bot_token or not self.telegram_channel_id:
+            return False
+        
+        self._tg_queue.put(message)
+        return True
+
+    def _post_telegram_message(self, message):
         """Send message to Telegram"""
         try:
-            if not self.telegram_bot_token or not self.telegram_channel_id:
-                return False
-                
-            url = f"https://api.telegram.org/bot{self.telegram_bot_token}/sendMessage"
             payload = {
                 "chat_id": self.telegram_channel_id,
                 "text": message,
                 "parse_mode": "HTML"
             }
             
-            response = requests.post(url, json=payload, timeout=10)
+            response = self._http.post(self._telegram_url, json=payload, timeout=10)
             return response.status_code == 200
             
         except Exception as e:
             print(f"❌ Telegram error: {e}")
             return False
 
+    def _wait_quietly(self, timeout, condition):
+        """Wait until condition holds; return False instead of raising on timeout"""
+        try:
+            # Elements re-rendered mid-poll go stale; keep polling instead of failing
+            wait = WebDriverWait(self.driver, timeout,
+                                 ignored_exceptions=(StaleElementReferenceException,))
+            return bool(wait.until(condition))
+        except TimeoutException:
+            return False
+
     def handle_puzzle_verification(self):
         """Handle drag-and-drop puzzle verification"""
         print("🧩 Handling puzzle verification...")
         try:
             # Wait for puzzle element to appear
-            puzzle_selectors = [
-                ".verify-bar",
-                ".slider",
-                ".drag-handle",
-                "[class*='verify']",
-                "[class*='slider']"
-            ]
-            
             puzzle_element = None
-            for selector in puzzle_selectors:
+            for selector in self.PUZZLE_SELECTORS:
                 try:
                     puzzle_element = self.wait.until(
                         EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
@@ -142,7 +309,7 @@ class QuantumExpertSystem:
                 actions.perform()
                 
                 print("✅ Puzzle verification completed")
-                time.sleep(3)
+                self._wait_quietly(3, EC.invisibility_of_element(puzzle_element))
                 return True
                 
         except Exception as e:
@@ -154,38 +321,24 @@ class QuantumExpertSystem:
         """Handle multiple confirmation/receive screens"""
         print("🔄 Handling confirmation screens...")
         
-        confirmation_selectors = [
-            "button:contains('Confirm')",
-            "button:contains('OK')",
-            "button:contains('Yes')",
-            "button:contains('Agree')",
-            "button:contains('Receive')",
-            ".confirm-btn",
-            ".ok-button",
-            ".btn-confirm"
-        ]
-        
         max_screens = 6
         screens_handled = 0
         
         for _ in range(max_screens):
             clicked = False
-            for selector in confirmation_selectors:
-                try:
-                    # Try CSS selector first
-                    buttons = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    for button in buttons:
-                        if button.is_displayed():
-                            button.click()
-                            print(f"✅ Clicked: {selector}")
-                            clicked = True
-                            screens_handled += 1
-                            time.sleep(2)
-                            break
-                    if clicked:
+            try:
+                buttons = self.driver.find_elements(*self.CONFIRM_LOCATOR)
+                for button in buttons:
+                    if button.is_displayed():
+                        label = button.text.strip()
+                        button.click()
+                        print(f"✅ Clicked: {label}")
+                        clicked = True
+                        screens_handled += 1
+                        self._wait_quietly(2, EC.invisibility_of_element(button))
                         break
-                except:
-                    continue
+            except:
+                pass
             
             if not clicked:
                 break
@@ -201,43 +354,32 @@ class QuantumExpertSystem:
             # Game page URL
             game_url = "https://55club.game/#/saasLottery/WinGo?gameCode=WinGo_30S&lottery=WinGo"
             self.driver.get(game_url)
-            time.sleep(8)
             
             # Wait for game to load and switch to 1M
-            game_loaded = False
-            game_indicators = ['Period', 'Number', 'Big', 'Small', 'WinGo']
-            
-            for _ in range(5):
-                page_text = self.driver.find_element(By.TAG_NAME, "body").text
-                if any(indicator in page_text for indicator in game_indicators):
-                    game_loaded = True
-                    break
-                time.sleep(3)
+            game_loaded = self._wait_quietly(25, lambda d: any(
+                indicator in d.find_element(By.TAG_NAME, "body").text
+                for indicator in self.GAME_INDICATORS
+            ))
             
             if not game_loaded:
                 print("❌ Game page not loaded properly")
                 return False
             
-            # Switch to 1M game tab
-            tab_selectors = [
-                "button:contains('1M')",
-                "a[href*='1M']",
-                ".tab:contains('1M')",
-                "[class*='1m']",
-                "[class*='one']"
-            ]
-            
-            for selector in tab_selectors:
-                try:
-                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    for element in elements:
-                        if element.is_displayed():
-                            element.click()
-                            print("✅ Switched to 1M game")
-                            time.sleep(5)
-                            return True
-                except:
-                    continue
+            # Switch to 1M game tab once the tabs have rendered (8 s, as the old page sleep)
+            self._wait_quietly(8, EC.visibility_of_any_elements_located(self.TAB_1M_LOCATOR))
+            try:
+                elements = self.driver.find_elements(*self.TAB_1M_LOCATOR)
+                for element in elements:
+                    if element.is_displayed():
+                        previous_period = self.get_current_period()
+                        element.click()
+                        print("✅ Switched to 1M game")
+                        # The 1M game shows a different running period once loaded
+                        self._wait_quietly(5, lambda d: self.get_current_period() != previous_period)
+                        self._results_container = None
+                        return True
+            except:
+                pass
             
             print("⚠️ Could not find 1M tab, continuing with current game")
             return True
@@ -253,28 +395,21 @@ class QuantumExpertSystem:
         try:
             # Navigate to login page
             self.driver.get("https://55club.game/")
-            time.sleep(8)
+            # Logged-out sessions are redirected to the login route
+            self._wait_quietly(8, lambda d: "login" in d.current_url.lower())
             
             # Check if already logged in
             if "login" not in self.driver.current_url.lower():
                 print("✅ Already logged in")
                 return True
             
+            # The redirect can land before the form renders (eager page loads)
+            self._wait_quietly(8, EC.presence_of_element_located(
+                (By.CSS_SELECTOR, ", ".join(self.PASSWORD_SELECTORS))
+            ))
+            
             # Find and fill login form
-            username_selectors = [
-                "input[type='text']",
-                "input[name='username']",
-                "input[placeholder*='phone']",
-                "input[placeholder*='email']"
-            ]
-            
-            password_selectors = [
-                "input[type='password']",
-                "input[name='password']"
-            ]
-            
-            # Fill username
-            for selector in username_selectors:
+            for selector in self.USERNAME_SELECTORS:
                 try:
                     username_field = self.driver.find_element(By.CSS_SELECTOR, selector)
                     username_field.clear()
@@ -285,7 +420,7 @@ class QuantumExpertSystem:
                     continue
             
             # Fill password
-            for selector in password_selectors:
+            for selector in self.PASSWORD_SELECTORS:
                 try:
                     password_field = self.driver.find_element(By.CSS_SELECTOR, selector)
                     password_field.clear()
@@ -296,18 +431,13 @@ class QuantumExpertSystem:
                     continue
             
             # Click login button
-            login_selectors = [
-                "button[type='submit']",
-                "button:contains('Login')",
-                "button:contains('Sign In')"
-            ]
-            
-            for selector in login_selectors:
+            for locator in self.LOGIN_LOCATORS:
                 try:
-                    login_btn = self.driver.find_element(By.CSS_SELECTOR, selector)
+                    login_btn = self.driver.find_element(*locator)
+                    login_url = self.driver.current_url
                     login_btn.click()
                     print("✅ Login button clicked")
-                    time.sleep(5)
+                    self._wait_quietly(5, EC.url_changes(login_url))
                     break
                 except:
                     continue
@@ -326,35 +456,37 @@ class QuantumExpertSystem:
             return False
 
     # QUANTUM PREDICTION ENGINE (From your original code)
+    def _results_text(self):
+        """Get text of the game record list, falling back to the whole page"""
+        if self._results_container is None:
+            containers = self.driver.find_elements(By.CSS_SELECTOR, self.RESULTS_CONTAINER_SELECTOR)
+            if not containers:
+                return self.driver.find_element(By.TAG_NAME, "body").text
+            self._results_container = containers[0]
+        
+        try:
+            return self._results_container.text
+        except StaleElementReferenceException:
+            # List was re-rendered; locate it again on the next cycle
+            self._results_container = None
+            return self.driver.find_element(By.TAG_NAME, "body").text
+
     def extract_game_data(self):
         """Extract game data from page"""
         print("🔍 Extracting game data...")
         
         data = []
         try:
-            # Multiple extraction methods
-            body_text = self.driver.find_element(By.TAG_NAME, "body").text
-            lines = [line.strip() for line in body_text.split('\n') if line.strip()]
-            
-            i = 0
-            while i < len(lines) - 2:
-                line1 = lines[i].replace(' ', '').replace('-', '')
-                line2 = lines[i+1].replace(' ', '') if i+1 < len(lines) else ""
-                line3 = lines[i+2] if i+2 < len(lines) else ""
-                
-                if (line1.isdigit() and len(line1) == 17 and
-                    line2.isdigit() and 0 <= int(line2) <= 9 and
-                    line3 in ['Big', 'Small']):
-                    
-                    data.append({
-                        'period': line1,
-                        'number': int(line2),
-                        'big_small': line3,
-                        'color': 'green' if int(line2) == 0 else 'red' if int(line2) % 2 == 1 else 'violet'
-                    })
-                    i += 3
-                else:
-                    i += 1
+            results_text = self._results_text()
+            
+            for match in self.GAME_ROW_RE.finditer(results_text):
+                number = int(match.group(2))
+                data.append({
+                    'period': match.group(1).replace(' ', '').replace('-', ''),
+                    'number': number,
+                    'big_small': match.group(3),
+                    'color': NUMBER_COLORS[number]
+                })
                     
             print(f"📊 Extracted {len(data)} records")
             return data
@@ -364,19 +496,18 @@ class QuantumExpertSystem:
             return []
 
     def quantum_prediction_engine(self, training_data):
-        """Quantum prediction engine"""
-        if len(training_data) < 10:
+        """Quantum prediction engine (training_data: bool array of Big results, newest first)"""
+        if training_data.size < 10:
             return self.fallback_prediction(training_data)
         
-        # Analyze recent trends
-        results = [game['big_small'] for game in training_data[:20]]
-        big_count = results.count('Big')
-        total = len(results)
+        # Analyze recent trends; the Big count is shared by trend and statistical analysis
+        results = training_data[:20]
+        big_count = int(results.sum())
         
         # Multiple strategy analysis
-        trend_pred, trend_conf = self.trend_analysis(results)
+        trend_pred, trend_conf = self.trend_analysis(big_count, results.size)
         pattern_pred, pattern_conf = self.pattern_analysis(results)
-        statistical_pred, statistical_conf = self.statistical_analysis(results)
+        statistical_pred, statistical_conf = self.statistical_analysis(big_count, results.size)
         
         # Weighted combination
         final_prediction = trend_pred if trend_conf > pattern_conf else pattern_pred
@@ -384,16 +515,24 @@ class QuantumExpertSystem:
         
         reasoning = f"Trend: {trend_pred}({trend_conf:.2f}), Pattern: {pattern_pred}({pattern_conf:.2f})"
         
-        return {
-            "prediction": final_prediction,
-            "confidence": confidence,
-            "strategy": "quantum_adaptive", 
-            "reasoning": reasoning
-        }
-
-    def trend_analysis(self, results):
-        big_count = results.count('Big')
-        ratio = big_count / len(results) if results else 0.5
+        return Prediction(
+            prediction=final_prediction,
+            confidence=confidence,
+            strategy="quantum_adaptive",
+            reasoning=reasoning
+        )
+
+    def cached_prediction(self, training_data):
+        """Reuse the last prediction while the analysed window is unchanged"""
+        # The engine only looks at the 20 most recent results
+        key = training_data[:20].tobytes()
+        if key != self._last_prediction_key:
+            self._last_prediction = self.quantum_prediction_engine(training_data)
+            self._last_prediction_key = key
+        return self._last_prediction
+
+    def trend_analysis(self, big_count, total):
+        ratio = big_count / total if total else 0.5
         
         if ratio > 0.6:
             return 'Big', 0.75
@@ -403,55 +542,46 @@ class QuantumExpertSystem:
             return 'Big' if ratio >= 0.5 else 'Small', 0.65
 
     def pattern_analysis(self, results):
-        if len(results) < 3:
+        if results.size < 3:
             return 'Small', 0.5
-            
-        streak = 1
-        for i in range(1, len(results)):
-            if results[i] == results[0]:
-                streak += 1
-            else:
-                break
-                
+        
+        # Length of the leading streak: index of the first differing result
+        breaks = results != results[0]
+        first_break = int(np.argmax(breaks))
+        streak = first_break if breaks[first_break] else results.size
+        
+        latest = 'Big' if results[0] else 'Small'
         if streak >= 3:
-            opposite = 'Small' if results[0] == 'Big' else 'Big'
+            opposite = 'Small' if results[0] else 'Big'
             return opposite, 0.70
         else:
-            return results[0], 0.60
+            return latest, 0.60
 
-    def statistical_analysis(self, results):
-        big_count = results.count('Big')
-        return 'Big' if big_count >= len(results)/2 else 'Small', 0.65
+    def statistical_analysis(self, big_count, total):
+        return 'Big' if big_count * 2 >= total else 'Small', 0.65
 
     def fallback_prediction(self, training_data):
-        return {
-            "prediction": "Small",
-            "confidence": 0.5, 
-            "strategy": "fallback",
-            "reasoning": "Insufficient data"
-        }
+        return Prediction(
+            prediction="Small",
+            confidence=0.5,
+            strategy="fallback",
+            reasoning="Insufficient data"
+        )
 
     def format_prediction_message(self, prediction_data, period):
-        prediction = prediction_data["prediction"]
-        confidence = prediction_data["confidence"]
-        
-        emoji = "🔴" if prediction == "B" else "🔵"
+        confidence = prediction_data.confidence
         confidence_color = "🟢" if confidence > 0.7 else "🟡" if confidence > 0.6 else "🟠"
         
-        message = f"""
-{emoji} <b>QUANTUM PREDICTION</b> {emoji}
-
-🎯 <b>Prediction:</b> <code>{prediction}</code>
-📊 <b>Confidence:</b> <code>{confidence:.2%}</code> {confidence_color}
-🎮 <b>Period:</b> <code>{period}</code>
-🤖 <b>Strategy:</b> <code>{prediction_data['strategy']}</code>
-
-💡 <b>Analysis:</b>
-{prediction_data['reasoning']}
-
-⏰ <i>Generated: {datetime.now().strftime('%H:%M:%S')}</i>
-        """
-        return message.strip()
+        return PREDICTION_MESSAGE_TEMPLATE.format_map({
+            'emoji': PREDICTION_EMOJI.get(prediction_data.prediction, "🔵"),
+            'prediction': prediction_data.prediction,
+            'confidence': confidence,
+            'confidence_color': confidence_color,
+            'period': period,
+            'strategy': prediction_data.strategy,
+            'reasoning': prediction_data.reasoning,
+            'generated_at': time.strftime('%H:%M:%S'),
+        })
 
     def run_expert_system(self):
         """Main expert system execution"""
@@ -472,50 +602,109 @@ class QuantumExpertSystem:
         # Main prediction loop
         print("🔮 Starting prediction cycles...")
         
-        for cycle in range(5):  # 5 cycles for testing
-            print(f"\n🔄 Cycle {cycle + 1}/5")
+        # Scrape on this thread while a worker stores results and predicts
+        cycle_queue = queue.Queue(maxsize=4)
+        processor = threading.Thread(target=self._process_cycles, args=(cycle_queue,))
+        processor.start()
+        
+        try:
+            self._scrape_cycles(5, cycle_queue)  # 5 cycles for testing
+        finally:
+            cycle_queue.put(None)
+            processor.join()
+        
+        # Completion message
+        self.send_telegram_message("✅ <b>Quantum System Completed</b>\n📊 5 cycles executed\n🤖 Ready for next run")
+
+    def _scrape_cycles(self, cycles, cycle_queue):
+        """Producer: extract page data each cycle and hand it to the processor"""
+        for cycle in range(cycles):
+            print(f"\n🔄 Cycle {cycle + 1}/{cycles}")
             
             try:
                 # Extract current data
                 game_data = self.extract_game_data()
-                if game_data:
-                    # Save to database
-                    for game in game_data:
-                        try:
-                            self.cursor.execute('''
-                                INSERT OR IGNORE INTO quantum_game_results 
-                                (period, number, big_small, color, game_type)
-                                VALUES (?, ?, ?, ?, ?)
-                            ''', (game['period'], game['number'], game['big_small'], 
-                                  game['color'], self.game_type))
-                        except:
-                            pass
-                    self.conn.commit()
-                
-                # Get training data
-                training_data = self.get_training_data()
-                
-                # Make prediction
-                prediction_data = self.quantum_prediction_engine(training_data)
                 
                 # Get current period
                 current_period = self.get_current_period()
                 
-                if current_period and current_period != self.current_running_period:
-                    # Send prediction to Telegram
-                    message = self.format_prediction_message(prediction_data, current_period)
-                    self.send_telegram_message(message)
-                    
-                    self.current_running_period = current_period
-                
+                cycle_queue.put((game_data, current_period))
                 time.sleep(15)  # Wait 15 seconds between cycles
                 
             except Exception as e:
                 print(f"❌ Cycle error: {e}")
                 time.sleep(10)
+
+    def _process_cycles(self, cycle_queue):
+        """Consumer: store scraped data, predict and notify until a None sentinel"""
+        while True:
+            item = cycle_queue.get()
+            if item is None:
+                break
+            
+            try:
+                self.process_cycle(*item)
+            except Exception as e:
+                print(f"❌ Cycle error: {e}")
+
+    def process_cycle(self, game_data, current_period):
+        """Save scraped results, predict, and send the prediction for a new period"""
+        is_new_period = current_period and current_period != self.current_running_period
         
-        # Completion message
-        self.send_telegram_message("✅ <b>Quantum System Completed</b>\n📊 5 cycles executed\n🤖 Ready for next run")
+        # Results and prediction share one transaction per cycle
+        with self._db_lock, self.conn:
+            if game_data:
+                rows = [(g['period'], g['number'], g['big_small'], g['color'], self.game_type)
+                        for g in game_data]
+                self._bulk_insert(rows)
+            
+            # Get training data
+            training_data = self.update_recent_results(game_data)
+            
+            # Make prediction
+            prediction_data = self.cached_prediction(training_data)
+            
+            if is_new_period:
+                self.cursor.execute(self.INSERT_PREDICTION_SQL, (
+                    current_period, prediction_data.prediction,
+                    prediction_data.confidence, prediction_data.strategy
+                ))
+        
+        if is_new_period:
+            # Send prediction to Telegram
+            message = self.format_prediction_message(prediction_data, current_period)
+            self.send_telegram_message(message)
+            
+            self.current_running_period = current_period
+
+    def update_recent_results(self, game_data):
+        """Merge newly scraped games into the in-memory history.
+
+        Returns a bool array of Big results, newest first.
+        """
+        if self._recent_periods is None:
+            # Cold start: seed from the database (already includes this cycle's rows)
+            seed = self.get_training_data(self.TRAINING_WINDOW)[::-1]  # oldest first
+            self._recent_big[:len(seed)] = np.fromiter(
+                (game['big_small'] == 'Big' for game in seed), dtype=np.bool_, count=len(seed)
+            )
+            self._recent_periods = collections.deque((game['period'] for game in seed),
+                                                     maxlen=self.TRAINING_WINDOW)
+            self._recent_pos = len(seed) % self.TRAINING_WINDOW
+        
+        known_periods = set(self._recent_periods)
+        new_games = [game for game in game_data if game['period'] not in known_periods]
+        for game in reversed(new_games):
+            self._push_recent_result(game)
+        
+        # Walk the ring backwards from the last write to get newest-first order
+        order = (self._recent_pos - 1 - np.arange(len(self._recent_periods))) % self.TRAINING_WINDOW
+        return self._recent_big[order]
+
+    def _push_recent_result(self, game):
+        self._recent_big[self._recent_pos] = game['big_small'] == 'Big'
+        self._recent_periods.append(game['period'])
+        self._recent_pos = (self._recent_pos + 1) % self.TRAINING_WINDOW
 
     def get_training_data(self, limit=50):
         """Get training data from database"""
@@ -546,8 +735,13 @@ class QuantumExpertSystem:
 
     def close(self):
         """Cleanup resources"""
+        # Flush pending Telegram messages before tearing down the session
+        self._tg_queue.put(None)
+        self._tg_thread.join(timeout=30)
+        
         try:
             self.conn.close()
+            self._http.close()
             self.driver.quit()
         except:
             pass